@@ -23,4 +23,4 @@ echo "Model already loaded in image!"
 
 # Run the Python script
 echo "Starting Python application..."
-python sdverse_products.py
\ No newline at end of file
+python sdverse_products.py "$@"
\ No newline at end of file
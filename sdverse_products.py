@@ -1,13 +1,21 @@
 import os
 import re
 import json
+import math
+import asyncio
+import hashlib
+import sqlite3
+import argparse
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 
-import requests
-from bs4 import BeautifulSoup
-from PyPDF2 import PdfReader
+import httpx
+import numpy as np
+import orjson
+import pymupdf
+from bs4 import BeautifulSoup, SoupStrainer
 from pptx import Presentation
 from docx import Document
 
@@ -15,12 +23,51 @@ from docx import Document
 # CONFIG
 # -------------------------
 OUTPUT_FOLDER = "output"
-MODEL = "llama3"
+# 4-bit quantized build: about half the memory traffic per token of 8-bit,
+# with little quality loss for extracting descriptions. Use
+# "llama3:8b-instruct-q5_K_M" if answers need to be more accurate.
+MODEL = "llama3:8b-instruct-q4_K_M"
+OLLAMA_URL = "http://localhost:11434"
+OLLAMA_TIMEOUT = 300  # 5 minute timeout for long responses
+WEB_TIMEOUT = 10      # timeout for fetching web pages
+KEEP_ALIVE = "30m"    # keep model weights loaded between requests
+NUM_PREDICT = 512     # max tokens generated per question
+NUM_CTX = 4096        # model context window, sized for the trimmed context below
+# Documents sent to Ollama at once; matches the server's parallel slots.
+# Never below 1, or folder runs would have no consumers and hang.
+try:
+    OLLAMA_WORKERS = max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", "4")))
+except ValueError:
+    OLLAMA_WORKERS = 4
+QUEUE_SIZE = 4        # extracted documents waiting for a worker
+PDF_PAGES_PER_TASK = 50  # larger PDFs are split across worker processes
+CACHE_FILE = ".cache.sqlite"  # answer cache, stored in the output folder
+SUPPORTED_EXTENSIONS = frozenset({".pdf", ".pptx", ".docx"})
 
-QUESTIONS = [
-    "provide short description of the product or services?",
-    "provide long description of the product or services?"
-]
+# Semantic cache: reuse answers for documents whose embedding is this close
+EMBED_MODEL = "nomic-embed-text"
+EMBED_CHARS = 8192           # leading characters of a document that get embedded
+SEMANTIC_THRESHOLD = 0.95    # cosine similarity; raise toward 0.98 for fewer false hits
+
+# Context sent to the model: the start of the document plus the passages
+# that score best (TF-IDF) on the keywords below, within a token budget
+CONTEXT_TOKENS = NUM_CTX - 2 * NUM_PREDICT - 256  # leave room for the questions and both answers
+LEAD_TOKENS = 512
+CHARS_PER_TOKEN = 4      # rough estimate, avoids depending on a tokenizer
+PASSAGE_CHARS = 1000     # lines are grouped into passages of about this size
+CONTEXT_KEYWORDS = {
+    "product", "products", "service", "services",
+    "solution", "solutions", "description", "features",
+}
+
+# Only these tags are kept when parsing web pages
+TEXT_TAGS = ["title", "h1", "h2", "h3", "h4", "h5", "h6", "p", "li"]
+
+# JSON key the model answers under -> question text used in the output
+QUESTIONS = {
+    "short_description": "provide short description of the product or services?",
+    "long_description": "provide long description of the product or services?"
+}
 
 # -------------------------
 # HELPERS
@@ -36,28 +83,29 @@ def check_ollama():
         return False
 
 # ---- File parsers ----
-def extract_text_from_pdf(file_path):
-    text = []
-    reader = PdfReader(file_path)
-    for page in reader.pages:
-        text.append(page.extract_text() or "")
-    return "\n".join(text)
+def extract_text_from_pdf(file_path, start=0, stop=None):
+    with pymupdf.open(file_path) as doc:
+        return "\n".join(page.get_text("text") for page in doc.pages(start, stop))
 
 def extract_text_from_pptx(file_path):
-    text = []
-    prs = Presentation(file_path)
-    for slide in prs.slides:
-        for shape in slide.shapes:
-            if hasattr(shape, "text"):
-                text.append(shape.text)
-    return "\n".join(text)
+    # Open the file ourselves so the handle is closed as soon as it's read
+    with open(file_path, "rb") as f:
+        prs = Presentation(f)
+    # Skip pictures, tables and other shapes without a text frame;
+    # para.text keeps line breaks and fields (dates, slide numbers)
+    paragraphs = (
+        para.text
+        for slide in prs.slides
+        for shape in slide.shapes
+        if shape.has_text_frame
+        for para in shape.text_frame.paragraphs
+    )
+    return "\n".join(p for p in paragraphs if p)
 
 def extract_text_from_docx(file_path):
-    text = []
-    doc = Document(file_path)
-    for para in doc.paragraphs:
-        text.append(para.text)
-    return "\n".join(text)
+    with open(file_path, "rb") as f:
+        doc = Document(f)
+    return "\n".join(para.text for para in doc.paragraphs if para.text)
 
 def extract_text_from_file(file_path):
     ext = file_path.suffix.lower()
@@ -70,103 +118,389 @@ def extract_text_from_file(file_path):
     else:
         raise ValueError(f"Unsupported file type: {ext}")
 
+def extract_pdf_head(file_path):
+    """Return the page count and the text of the first PDF_PAGES_PER_TASK pages."""
+    with pymupdf.open(file_path) as doc:
+        head = "\n".join(page.get_text("text") for page in doc.pages(0, PDF_PAGES_PER_TASK))
+        return doc.page_count, head
+
+async def extract_in_pool(executor, file_path):
+    """Extract one file's text in worker processes.
+
+    PyMuPDF is not thread-safe, so large PDFs are split into page ranges
+    handled by separate worker processes instead. The page count is read by
+    the worker that extracts the first range, keeping PDF parsing off the
+    event loop.
+    """
+    loop = asyncio.get_running_loop()
+    if file_path.suffix.lower() != ".pdf":
+        return await loop.run_in_executor(executor, extract_text_from_file, file_path)
+
+    page_count, head = await loop.run_in_executor(executor, extract_pdf_head, file_path)
+    rest = await asyncio.gather(*(
+        loop.run_in_executor(executor, extract_text_from_pdf, file_path, start, start + PDF_PAGES_PER_TASK)
+        for start in range(PDF_PAGES_PER_TASK, page_count, PDF_PAGES_PER_TASK)
+    ))
+    return "\n".join([head, *rest])
+
+async def extract_texts(files, queue):
+    """Extract text from files in parallel worker processes.
+
+    Each (file_path, text, source_mtime) tuple is put on `queue` as soon as
+    that file is done, so the model can start on it while the rest are still
+    parsing. The mtime is taken before the file is read, so an edit made
+    during extraction is never recorded as processed. Files that fail to
+    parse are reported and left out.
+    """
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+
+        async def finish(file_path):
+            try:
+                source_mtime = file_path.stat().st_mtime_ns
+                text = await extract_in_pool(executor, file_path)
+            except Exception as e:
+                print(f"Error processing {file_path.name}: {e}")
+                return
+            await queue.put((file_path, text, source_mtime))
+
+        await asyncio.gather(*(finish(file_path) for file_path in files))
+
 # ---- Web parser ----
-def extract_text_from_url(url):
+def parse_html(content):
+    # lxml parses in C, and the strainer drops everything outside
+    # TEXT_TAGS (scripts, styles, navigation) while parsing
+    soup = BeautifulSoup(content, "lxml", parse_only=SoupStrainer(TEXT_TAGS))
+
+    text_parts = (tag.get_text(strip=True) for tag in soup)
+    return "\n".join(text for text in text_parts if text)
+
+async def extract_text_from_url(client, url):
     try:
-        response = requests.get(url, timeout=10)
+        response = await client.get(url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # remove scripts and styles
-        for tag in soup(["script", "style", "noscript"]):
-            tag.extract()
-
-        text_parts = []
-        # title
-        if soup.title:
-            text_parts.append(soup.title.get_text())
-        # headings and paragraphs
-        for tag in soup.find_all(["h1","h2","h3","h4","h5","h6","p","li"]):
-            text = tag.get_text(strip=True)
-            if text:
-                text_parts.append(text)
-
-        return "\n".join(text_parts)
+        # Parse off the event loop so other fetches and Ollama calls keep going
+        return await asyncio.to_thread(parse_html, response.content)
     except Exception as e:
         print(f"Failed to fetch {url}: {e}")
         return ""
 
+_SLUG_RE = re.compile(r"[^a-zA-Z0-9_]+")
+
 def slugify_url(url):
     parsed = urlparse(url)
     slug = parsed.netloc.replace(".", "_") + parsed.path.replace("/", "_")
-    slug = re.sub(r"[^a-zA-Z0-9_]+", "", slug)
+    slug = _SLUG_RE.sub("", slug)
     return slug.strip("_") or "link"
 
+# ---- Context ----
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+def split_passages(text):
+    """Group lines into passages of roughly PASSAGE_CHARS characters.
+
+    Lines longer than PASSAGE_CHARS are cut into chunks of that size first,
+    so no passage is too big to fit the context budget.
+    """
+    passages = []
+    current = []
+    size = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        for start in range(0, len(line), PASSAGE_CHARS):
+            chunk = line[start:start + PASSAGE_CHARS]
+            current.append(chunk)
+            size += len(chunk) + 1
+            if size >= PASSAGE_CHARS:
+                passages.append("\n".join(current))
+                current = []
+                size = 0
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+def score_passages(passages):
+    """TF-IDF score of each passage against CONTEXT_KEYWORDS."""
+    words = [_WORD_RE.findall(p.lower()) for p in passages]
+    doc_freq = dict.fromkeys(CONTEXT_KEYWORDS, 0)
+    for passage_words in words:
+        for keyword in CONTEXT_KEYWORDS.intersection(passage_words):
+            doc_freq[keyword] += 1
+
+    # smoothed idf, as in scikit-learn's TfidfVectorizer
+    n = len(passages)
+    idf = {k: math.log((1 + n) / (1 + df)) + 1 for k, df in doc_freq.items()}
+
+    scores = []
+    for passage_words in words:
+        hits = sum(idf[w] for w in passage_words if w in idf)
+        scores.append(hits / len(passage_words) if passage_words else 0.0)
+    return scores
+
+def build_context(text):
+    """Trim a document to CONTEXT_TOKENS, keeping its opening and the most relevant passages."""
+    budget = CONTEXT_TOKENS * CHARS_PER_TOKEN
+    if len(text) <= budget:
+        return text
+
+    passages = split_passages(text)
+    if not passages:
+        # nothing but whitespace
+        return text[:budget]
+    scores = score_passages(passages)
+
+    selected = set()
+    used = 0
+    # the opening usually introduces what the document is about
+    for i, passage in enumerate(passages):
+        if used + len(passage) > LEAD_TOKENS * CHARS_PER_TOKEN:
+            break
+        selected.add(i)
+        used += len(passage) + 1
+
+    for i in sorted(range(len(passages)), key=scores.__getitem__, reverse=True):
+        if i in selected or used + len(passages[i]) > budget:
+            continue
+        selected.add(i)
+        used += len(passages[i]) + 1
+
+    return "\n".join(passages[i] for i in sorted(selected))
+
+# ---- Cache ----
+def open_cache(output_folder):
+    """Open the answer cache, creating it if needed."""
+    conn = sqlite3.connect(output_folder / CACHE_FILE)
+    conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, answer TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS semantic (scope TEXT, embedding BLOB, answer TEXT)")
+    return conn
+
+def cache_key(prompt):
+    return hashlib.sha256(f"{MODEL}|{prompt}".encode("utf-8")).hexdigest()
+
+def cache_get(cache, key):
+    row = cache.execute("SELECT answer FROM cache WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def cache_put(cache, key, qa_results):
+    cache.execute(
+        "INSERT OR REPLACE INTO cache (key, answer) VALUES (?, ?)",
+        (key, json.dumps(qa_results, ensure_ascii=False)),
+    )
+    cache.commit()
+
+def semantic_scope():
+    """Semantic entries are only comparable for the same models and questions."""
+    return cache_key(f"{EMBED_MODEL}|{build_prompt('')}")
+
+def semantic_cache_get(cache, embedding):
+    """Return the answers of the most similar cached document, if similar enough."""
+    rows = cache.execute(
+        "SELECT embedding, answer FROM semantic WHERE scope = ?", (semantic_scope(),)
+    ).fetchall()
+    if not rows:
+        return None
+
+    # Stored embeddings are unit length, so a dot product is the cosine similarity
+    matrix = np.stack([np.frombuffer(row[0], dtype=np.float32) for row in rows])
+    scores = matrix @ embedding
+    best = int(np.argmax(scores))
+    if scores[best] < SEMANTIC_THRESHOLD:
+        return None
+    return json.loads(rows[best][1])
+
+def semantic_cache_put(cache, embedding, qa_results):
+    cache.execute(
+        "INSERT INTO semantic (scope, embedding, answer) VALUES (?, ?, ?)",
+        (semantic_scope(), embedding.tobytes(), json.dumps(qa_results, ensure_ascii=False)),
+    )
+    cache.commit()
+
 # ---- Ollama ----
-def ask_ollama(question, context_text):
-    """Send a question with context to Ollama and return the response."""
-    prompt = f"Context:\n{context_text}\n\nQuestion: {question}"
-    
+async def preload_model(client):
+    """Load the model into memory up front so the first question doesn't pay for it."""
     try:
-        result = subprocess.run(
-            ["ollama", "run", MODEL],
-            input=prompt,  # Pass as string, not bytes
-            capture_output=True,
-            text=True,     # Text mode - expects string input
-            timeout=300    # 5 minute timeout for long responses
+        response = await client.post(
+            "/api/generate",
+            # same num_ctx as real requests, or Ollama reloads the model for them
+            json={"model": MODEL, "prompt": "", "keep_alive": KEEP_ALIVE, "options": {"num_ctx": NUM_CTX}},
         )
-        
-        if result.returncode != 0:
-            print(f"Ollama error: {result.stderr}")
-            return f"Error: {result.stderr}"
-        
-        return result.stdout.strip()
-    
-    except subprocess.TimeoutExpired:
-        print(f"Ollama request timed out for question: {question}")
-        return "Error: Request timed out"
+        response.raise_for_status()
+    except Exception as e:
+        print(f"Failed to preload {MODEL}: {e}")
+
+def build_prompt(context_text):
+    """Ask every question in one prompt so the context is only prefilled once."""
+    numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(QUESTIONS.values(), 1))
+    keys = ", ".join(QUESTIONS)
+    return (
+        f"Context:\n{context_text}\n\n"
+        f"Answer the following as JSON with keys {keys}:\n{numbered}"
+    )
+
+async def embed_text(client, text):
+    """Return the unit-length embedding of a document, or None if it can't be computed."""
+    try:
+        response = await client.post(
+            "/api/embed",
+            json={"model": EMBED_MODEL, "input": text[:EMBED_CHARS], "keep_alive": KEEP_ALIVE},
+        )
+        response.raise_for_status()
+        embedding = np.asarray(response.json()["embeddings"][0], dtype=np.float32)
+        return embedding / np.linalg.norm(embedding)
+    except Exception as e:
+        print(f"Failed to embed document: {e}")
+        return None
+
+async def generate_answers(client, prompt):
+    """Stream the model's JSON answer, capped at NUM_PREDICT tokens per question."""
+    request = {
+        "model": MODEL,
+        "prompt": prompt,
+        "format": "json",
+        "stream": True,
+        "keep_alive": KEEP_ALIVE,
+        "options": {"num_ctx": NUM_CTX, "num_predict": NUM_PREDICT * len(QUESTIONS)},
+    }
+    buf = []
+    async with client.stream("POST", "/api/generate", json=request) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if "error" in chunk:
+                raise RuntimeError(chunk["error"])
+            buf.append(chunk["response"])
+            if chunk.get("done"):
+                break
+
+    # format=json only guarantees valid JSON, not the keys that were asked for
+    answers = json.loads("".join(buf))
+    if not isinstance(answers, dict):
+        raise ValueError(f"expected a JSON object, got {type(answers).__name__}")
+    missing = [key for key in QUESTIONS if key not in answers]
+    if missing:
+        raise ValueError(f"response is missing {', '.join(missing)}")
+    return {q: str(answers[key]).strip() for key, q in QUESTIONS.items()}
+
+async def ask_ollama(client, context_text, cache=None):
+    """Send all questions with context to the Ollama HTTP API.
+
+    Returns ({question: answer}, final). Successful answers are stored in
+    `cache` (if given) and reused for an identical prompt and model, or for
+    a document whose embedding is within SEMANTIC_THRESHOLD of one already
+    answered. `final` is False for errors and for answers borrowed from a
+    similar document, which are approximate and should be retried later.
+    """
+    prompt = build_prompt(build_context(context_text))
+
+    embedding = None
+    if cache is not None:
+        key = cache_key(prompt)
+        qa_results = cache_get(cache, key)
+        if qa_results is not None:
+            print("   Using cached answers")
+            return qa_results, True
+
+        embedding = await embed_text(client, context_text)
+        if embedding is not None:
+            qa_results = semantic_cache_get(cache, embedding)
+            if qa_results is not None:
+                print("   Using cached answers from a similar document")
+                return qa_results, False
+
+    try:
+        qa_results = await generate_answers(client, prompt)
+    except httpx.TimeoutException:
+        print("Ollama request timed out")
+        return {q: "Error: Request timed out" for q in QUESTIONS.values()}, False
     except Exception as e:
         print(f"Error calling Ollama: {e}")
-        return f"Error: {str(e)}"
+        return {q: f"Error: {str(e)}" for q in QUESTIONS.values()}, False
+
+    if cache is not None:
+        cache_put(cache, key, qa_results)
+        if embedding is not None:
+            semantic_cache_put(cache, embedding, qa_results)
+    return qa_results, True
 
 # ---- Processing ----
-def process_file(file_path, output_folder):
+def is_up_to_date(file_path, output_path):
+    """True if output_path already holds complete results for the current file_path."""
+    try:
+        source_mtime = file_path.stat().st_mtime_ns
+        if output_path.stat().st_mtime_ns < source_mtime:
+            return False
+        # Output mtimes don't survive copying between machines, so also
+        # check the source mtime recorded when the results were written
+        data = orjson.loads(output_path.read_bytes())
+        # a.pdf and a.docx share a.json, so check whose results these are
+        return (
+            isinstance(data, dict)
+            and data.get("source") == file_path.name
+            and data.get("source_mtime_ns") == source_mtime
+        )
+    except (OSError, orjson.JSONDecodeError):
+        return False
+
+async def process_file(client, cache, file_path, text, source_mtime, output_folder):
     print(f"Processing file: {file_path.name}")
     
     try:
-        text = extract_text_from_file(file_path)
-        
         if not text.strip():
             print(f"No text extracted from {file_path.name}")
             return
         
         print(f"   Extracted {len(text)} characters")
         
-        qa_results = {}
-        for q in QUESTIONS:
-            print(f"   Asking: {q}")
-            answer = ask_ollama(q, text)
-            qa_results[q] = answer
+        print(f"   Asking {len(QUESTIONS)} question(s)")
+        qa_results, final = await ask_ollama(client, text, cache)
 
         output_data = {
             "source": str(file_path.name),
             "qa": qa_results
         }
+        # Only answers generated for this document let a later run skip it
+        if final:
+            output_data["source_mtime_ns"] = source_mtime
         
         output_path = output_folder / f"{file_path.stem}.json"
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
         
         print(f"Saved results to {output_path}")
         
     except Exception as e:
         print(f"Error processing {file_path.name}: {e}")
 
-def process_url(url, output_folder):
+async def process_folder(client, cache, files, output_folder):
+    """Run extraction (CPU) and Ollama generation (GPU) as an overlapping pipeline."""
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    async def producer():
+        try:
+            await extract_texts(files, queue)
+        finally:
+            # Always release the consumers, even if extraction fails
+            for _ in range(OLLAMA_WORKERS):
+                await queue.put(None)
+
+    async def consumer():
+        # Consumers only stop on the sentinel, so the queue keeps draining
+        while (item := await queue.get()) is not None:
+            file_path, text, source_mtime = item
+            try:
+                await process_file(client, cache, file_path, text, source_mtime, output_folder)
+            except Exception as e:
+                print(f"Error processing {file_path.name}: {e}")
+
+    await asyncio.gather(producer(), *(consumer() for _ in range(OLLAMA_WORKERS)))
+
+async def process_url(client, web_client, cache, url, output_folder):
     print(f"Processing URL: {url}")
     
     try:
-        text = extract_text_from_url(url)
+        text = await extract_text_from_url(web_client, url)
         
         if not text.strip():
             print(f"No text extracted from {url}")
@@ -174,11 +508,8 @@ def process_url(url, output_folder):
         
         print(f"   Extracted {len(text)} characters")
         
-        qa_results = {}
-        for q in QUESTIONS:
-            print(f"   Asking: {q}")
-            answer = ask_ollama(q, text)
-            qa_results[q] = answer
+        print(f"   Asking {len(QUESTIONS)} question(s)")
+        qa_results, _ = await ask_ollama(client, text, cache)
 
         output_data = {
             "source": url,
@@ -187,8 +518,8 @@ def process_url(url, output_folder):
         
         slug = slugify_url(url)
         output_path = output_folder / f"{slug}.json"
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
         
         print(f"Saved results to {output_path}")
         
@@ -198,33 +529,67 @@ def process_url(url, output_folder):
 # -------------------------
 # MAIN
 # -------------------------
-def main():
+def parse_args():
+    parser = argparse.ArgumentParser(description="Describe products from documents and web pages with Ollama.")
+    parser.add_argument("--no-cache", action="store_true", help="always query the model, ignoring cached answers")
+    parser.add_argument("--force", action="store_true", help="reprocess files whose results are already up to date")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
     if not check_ollama():
         return
 
     output_folder = Path(OUTPUT_FOLDER)
     output_folder.mkdir(exist_ok=True)
+    cache = None if args.no_cache else open_cache(output_folder)
 
+    # One pooled client for the whole session; concurrent requests are
+    # served in parallel up to the server's OLLAMA_NUM_PARALLEL setting.
+    # Web pages get their own pooled HTTP/2 client so fetches to the same
+    # host share a connection.
+    async with httpx.AsyncClient(base_url=OLLAMA_URL, timeout=OLLAMA_TIMEOUT) as client, \
+            httpx.AsyncClient(http2=True, timeout=WEB_TIMEOUT, follow_redirects=True) as web_client:
+        await preload_model(client)
+        try:
+            await run(client, web_client, cache, output_folder, args.force)
+        finally:
+            if cache is not None:
+                cache.close()
+
+async def run(client, web_client, cache, output_folder, force=False):
     while True:
-        user_input = input("\nEnter a folder path (for files) or a link (http/https): ").strip()
+        user_input = input("\nEnter a folder path (for files) or one or more links (http/https): ").strip()
 
         if user_input.startswith("http://") or user_input.startswith("https://"):
-            process_url(user_input, output_folder)
+            urls = user_input.split()
+            await asyncio.gather(*(process_url(client, web_client, cache, url, output_folder) for url in urls))
         else:
             input_folder = Path(user_input)
             if not input_folder.exists() or not input_folder.is_dir():
                 print(f"Input path {user_input} is not a valid folder.")
                 continue
             
-            files = [f for f in input_folder.iterdir() if f.suffix.lower() in [".pdf", ".pptx", ".docx"]]
+            # scandir entries carry their file type, so filtering needs no extra stat calls
+            with os.scandir(input_folder) as entries:
+                files = [
+                    Path(entry.path) for entry in entries
+                    if os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS
+                    and entry.is_file()
+                ]
             if not files:
                 print("No supported files found in input folder.")
                 continue
             
             print(f"Found {len(files)} file(s) to process")
+
+            if not force:
+                stale = [f for f in files if not is_up_to_date(f, output_folder / f"{f.stem}.json")]
+                if len(stale) < len(files):
+                    print(f"Skipping {len(files) - len(stale)} unchanged file(s)")
+                files = stale
             
-            for file_path in files:
-                process_file(file_path, output_folder)
+            await process_folder(client, cache, files, output_folder)
 
         run_again = input("\n🔄 Do you want to process another folder/link? (y/n): ").strip().lower()
         if run_again != "y":
@@ -232,4 +597,4 @@ def main():
             break
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file